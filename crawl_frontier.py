@@ -0,0 +1,115 @@
+import heapq
+import itertools
+
+"""
+
+    Frontière de collecte multi-sauts, bornée en profondeur et en nombre de requêtes.
+
+    Les papiers racines (papers with code) sont à la profondeur 0, leurs références
+    sont résolues directement (profondeur 1). Les DOIs des références de ces
+    références (profondeur 2 et plus) sont placés dans la frontière, puis étendus
+    par ordre de priorité tant que le budget de requêtes le permet.
+
+    La priorité d'un DOI est son degré entrant : le nombre de papiers déjà collectés
+    qui le citent. Étendre en priorité les DOIs les plus cités maximise le nombre
+    d'arêtes du graphe obtenues par requête.
+
+"""
+
+
+class CrawlFrontier():
+    def __init__(self, max_depth=1, request_budget=None):
+        """
+        Args:
+            max_depth (int, optional): profondeur max des papiers collectés, les racines
+                étant à la profondeur 0. Avec 1, aucune expansion n'est faite. Defaults to 1.
+
+            request_budget (int, optional): nombre total de requêtes pouvant être consacrées
+                à l'expansion de la frontière, None pour aucune limite. Defaults to None.
+        """
+        self.max_depth = max_depth
+        self.request_budget = request_budget
+        self.requests_spent = 0
+
+        self.in_degree = {}
+        self.depth = {}
+        # DOIs déjà extraits de la frontière, même si leur collecte a échoué
+        self.expanded = set()
+        self._heap = []
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self.depth)
+
+    def remaining_budget(self):
+        """
+        Returns:
+            int: nombre de requêtes encore disponibles, None si pas de limite
+        """
+        if self.request_budget is None:
+            return None
+        return max(self.request_budget - self.requests_spent, 0)
+
+    def spend(self, num_requests):
+        self.requests_spent += num_requests
+
+    def add_references(self, ref_doi_list, depth):
+        """Enregistre les références d'un papier collecté : le degré entrant de
+            chaque DOI de la frontière est incrémenté. Un nouveau DOI entre dans la frontière si sa
+            profondeur est dans la limite, un DOI déjà en attente y est replacé avec
+            sa nouvelle priorité, quelle que soit la profondeur de la citation.
+            Un DOI déjà extrait de la frontière n'y est jamais replacé
+
+        Args:
+            ref_doi_list (list[str]): DOIs des références du papier
+            depth (int): profondeur des références (profondeur du papier + 1)
+        """
+        if self.max_depth <= 1:
+            # pas d'expansion : inutile de compter les citations
+            return
+
+        for doi in ref_doi_list:
+            if doi in self.expanded:
+                continue
+
+            # seuls les DOIs pouvant entrer dans la frontière sont comptés
+            if doi in self.depth:
+                self.depth[doi] = min(self.depth[doi], depth)
+            elif depth <= self.max_depth:
+                self.depth[doi] = depth
+            else:
+                continue
+            self.in_degree[doi] = self.in_degree.get(doi, 0) + 1
+
+            # les entrées obsolètes (degré entrant plus ancien) sont ignorées à l'extraction
+            heapq.heappush(
+                self._heap, (-self.in_degree[doi], next(self._counter), doi)
+            )
+
+    def pop_batch(self, batch_size, is_known):
+        """Extrait les DOIs les plus prioritaires de la frontière
+
+        Args:
+            batch_size (int): nombre max de DOIs extraits
+            is_known (callable): vrai pour un DOI déjà collecté, qui est alors ignoré
+
+        Returns:
+            list[tuple[str, int]]: liste de (DOI, profondeur)
+        """
+        batch = []
+        while self._heap and len(batch) < batch_size:
+            neg_degree, _, doi = heapq.heappop(self._heap)
+
+            if doi not in self.depth:
+                continue
+            if -neg_degree != self.in_degree[doi]:
+                continue
+
+            depth = self.depth.pop(doi)
+            del self.in_degree[doi]
+            self.expanded.add(doi)
+            if is_known(doi):
+                continue
+            batch.append((doi, depth))
+
+        return batch
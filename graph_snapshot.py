@@ -0,0 +1,499 @@
+import os
+import json
+import argparse
+
+import numpy as np
+
+"""
+
+    Format binaire du graphe de citations, lisible par memory-mapping.
+
+    Charger le dataset JSON (json.load) matérialise l'ensemble du corpus en objets
+    Python, ce qui coûte plusieurs secondes et plusieurs centaines de Mo à chaque
+    script d'analyse. Le snapshot est un dossier de fichiers .npy, chargés avec
+    np.load(mmap_mode="r") : l'ouverture est quasi instantanée, les tableaux ne
+    sont pas copiés, et seules les pages effectivement lues sont chargées.
+
+    Contenu d'un snapshot :
+        - meta.json : nombre de papiers / noeuds, disposition du JSON d'origine
+        - table des DOIs (noeuds) : les papiers du dataset, puis les DOIs seulement cités
+        - citations au format CSR : ref_indptr, ref_indices (indices de noeuds)
+        - date : datetime64[D], NaT si absente
+        - catégorie arxiv, éditeur : codes int32 (-1 si absent) + table de chaînes
+        - mots clés, auteurs : listes d'identifiants au format CSR + tables de chaînes
+        - present : masque de bits des champs en colonne présents dans chaque papier,
+          seuls ces champs sont réécrits lors du retour au JSON
+        - extra : les autres champs de chaque papier (titre, conférence...), en JSON
+
+    Une table de chaînes est stockée en deux tableaux : les octets utf-8 concaténés
+    (<nom>_bytes.npy) et les positions de début de chaque chaîne (<nom>_offsets.npy).
+
+        $ python3 graph_snapshot.py dataset.json dataset_snapshot
+        $ python3 graph_snapshot.py --to-json dataset_snapshot dataset.json
+
+        >>> snapshot = GraphSnapshot("dataset_snapshot")
+        >>> i = snapshot.doi_index("10.1109/cvpr.2016.90")
+        >>> [snapshot.dois[j] for j in snapshot.references(i)]
+
+"""
+
+SNAPSHOT_VERSION = 2
+
+COLUMN_FIELDS = [
+    "date", "arxiv_category", "publisher", "key_words", "authors"
+]
+LIST_FIELDS = ["key_words", "authors"]
+# bit du champ des références dans le masque de présence, après ceux de COLUMN_FIELDS
+REFERENCE_BIT = len(COLUMN_FIELDS)
+
+
+class StringTable():
+    """Table de chaînes de caractères, décodées à la demande depuis un tableau d'octets"""
+
+    def __init__(self, data, offsets, sorted_index=None):
+        """
+        Args:
+            data (np.ndarray[uint8]): octets utf-8 concaténés
+            offsets (np.ndarray[int64]): position de début de chaque chaîne, plus la fin du tableau
+            sorted_index (np.ndarray[int32], optional): indices des chaînes triées par octets,
+                pour la recherche par dichotomie. Defaults to None.
+        """
+        self.data = data
+        self.offsets = offsets
+        self.sorted_index = sorted_index
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self._bytes(i).decode("utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def _bytes(self, i):
+        if i < 0:
+            i += len(self)
+        return self.data[self.offsets[i]:self.offsets[i + 1]].tobytes()
+
+    def index(self, string):
+        """Recherche une chaîne par dichotomie, sans décoder toute la table
+
+        Args:
+            string (str): chaîne recherchée
+
+        Returns:
+            int: indice de la chaîne, -1 si absente
+        """
+        if self.sorted_index is None:
+            raise ValueError("string table is not sorted")
+
+        key = string.encode("utf-8")
+        low, high = 0, len(self.sorted_index)
+        while low < high:
+            middle = (low + high) // 2
+            if self._bytes(self.sorted_index[middle]) < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low < len(self.sorted_index) and self._bytes(self.sorted_index[low]) == key:
+            return int(self.sorted_index[low])
+        return -1
+
+
+def _string_table_arrays(strings, sort=False):
+    encoded = [s.encode("utf-8") for s in strings]
+
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded], dtype=np.int64)
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+    arrays = {"bytes": data, "offsets": offsets}
+    if sort:
+        arrays["sorted"] = np.array(
+            sorted(range(len(encoded)), key=encoded.__getitem__), dtype=np.int32
+        )
+    return arrays
+
+
+class _Vocabulary():
+    """Encodage par dictionnaire : associe un identifiant entier à chaque valeur distincte"""
+
+    def __init__(self):
+        self.ids = {}
+        self.values = []
+
+    def get_id(self, value):
+        if value not in self.ids:
+            self.ids[value] = len(self.values)
+            self.values.append(value)
+        return self.ids[value]
+
+
+def _csr_arrays(lists):
+    indptr = np.zeros(len(lists) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(l) for l in lists], dtype=np.int64)
+    indices = np.fromiter(
+        (i for l in lists for i in l), dtype=np.int32, count=int(indptr[-1])
+    )
+    return indptr, indices
+
+
+def _dataset_records(dataset):
+    """Normalise les deux dispositions du dataset JSON : dict indexé par DOI (main.py)
+        ou liste de papiers comportant une clé "doi"
+
+    Returns:
+        tuple: (liste de (doi, papier), disposition, clé des références)
+    """
+    if isinstance(dataset, dict):
+        records = list(dataset.items())
+        layout = "dict"
+    else:
+        records = [(paper["doi"], paper) for paper in dataset]
+        layout = "list"
+
+    reference_key = "reference"
+    for _, paper in records:
+        if "references" in paper:
+            reference_key = "references"
+            break
+
+    return records, layout, reference_key
+
+
+def write_snapshot(dataset, path):
+    """Écrit le snapshot binaire d'un dataset
+
+    Args:
+        dataset (dict | list): dataset tel que chargé depuis le JSON
+        path (str): dossier du snapshot, créé si besoin
+    """
+    records, layout, reference_key = _dataset_records(dataset)
+    os.makedirs(path, exist_ok=True)
+
+    nodes = _Vocabulary()
+    for doi, _ in records:
+        nodes.ids.setdefault(doi, len(nodes.values))
+        nodes.values.append(doi)
+
+    categories = _Vocabulary()
+    publishers = _Vocabulary()
+    keywords = _Vocabulary()
+    authors = _Vocabulary()
+
+    references = []
+    dates = []
+    category_codes = []
+    publisher_codes = []
+    keyword_lists = []
+    author_lists = []
+    extras = []
+    present = []
+
+    for _, paper in records:
+        references.append(
+            [nodes.get_id(ref_doi) for ref_doi in paper.get(reference_key) or []]
+        )
+
+        extra = {
+            k: v for k, v in paper.items()
+            if k not in COLUMN_FIELDS and k not in (reference_key, "doi")
+        }
+
+        present_mask = 0
+        for bit, field in enumerate(COLUMN_FIELDS):
+            if field in paper:
+                present_mask |= 1 << bit
+        if reference_key in paper:
+            present_mask |= 1 << REFERENCE_BIT
+
+        # une liste à None n'a pas de représentation en colonne, elle est conservée telle quelle
+        for bit, field in enumerate(COLUMN_FIELDS):
+            if field in LIST_FIELDS and field in paper and paper[field] is None:
+                extra[field] = None
+                present_mask &= ~(1 << bit)
+        if reference_key in paper and paper[reference_key] is None:
+            extra[reference_key] = None
+            present_mask &= ~(1 << REFERENCE_BIT)
+        present.append(present_mask)
+
+        # la date n'est stockée en colonne que si la conversion est sans perte
+        date = paper.get("date")
+        try:
+            date_value = np.datetime64(date, "D")
+        except (TypeError, ValueError):
+            date_value = np.datetime64("NaT")
+        if not np.isnat(date_value) and str(date_value) != date:
+            date_value = np.datetime64("NaT")
+        if np.isnat(date_value) and date is not None:
+            extra["date"] = date
+        dates.append(date_value)
+
+        category = paper.get("arxiv_category")
+        category_codes.append(-1 if category is None else categories.get_id(category))
+
+        publisher = paper.get("publisher")
+        publisher_codes.append(-1 if publisher is None else publishers.get_id(publisher))
+
+        keyword_lists.append(
+            [keywords.get_id(k) for k in paper.get("key_words") or []]
+        )
+        author_lists.append([
+            authors.get_id((
+                author["name"],
+                json.dumps(author.get("organisation"), ensure_ascii=False)
+            ))
+            for author in paper.get("authors") or []
+        ])
+
+        extras.append(json.dumps(extra, ensure_ascii=False))
+
+    arrays = {}
+    arrays["ref_indptr"], arrays["ref_indices"] = _csr_arrays(references)
+    arrays["keyword_indptr"], arrays["keyword_indices"] = _csr_arrays(keyword_lists)
+    arrays["author_indptr"], arrays["author_indices"] = _csr_arrays(author_lists)
+    arrays["date"] = np.array(dates, dtype="datetime64[D]")
+    arrays["category_codes"] = np.array(category_codes, dtype=np.int32)
+    arrays["present"] = np.array(present, dtype=np.uint8)
+    arrays["publisher_codes"] = np.array(publisher_codes, dtype=np.int32)
+
+    string_tables = {
+        "doi": _string_table_arrays(nodes.values, sort=True),
+        "category": _string_table_arrays(categories.values),
+        "publisher": _string_table_arrays(publishers.values),
+        "keyword": _string_table_arrays(keywords.values),
+        "author_name": _string_table_arrays([name for name, _ in authors.values]),
+        "author_organisation": _string_table_arrays([org for _, org in authors.values]),
+        "extra": _string_table_arrays(extras),
+    }
+    for table_name, table_arrays in string_tables.items():
+        for suffix, array in table_arrays.items():
+            arrays[f"{table_name}_{suffix}"] = array
+
+    for name, array in arrays.items():
+        np.save(os.path.join(path, name + ".npy"), array)
+
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "num_papers": len(records),
+        "num_nodes": len(nodes.values),
+        "layout": layout,
+        "reference_key": reference_key
+    }
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+
+def convert_json(json_path, path):
+    """Convertit un dataset JSON en snapshot binaire
+
+    Args:
+        json_path (str): chemin du dataset JSON
+        path (str): dossier du snapshot
+    """
+    with open(json_path, encoding="utf-8") as f:
+        dataset = json.load(f)
+
+    write_snapshot(dataset, path)
+
+
+class GraphSnapshot():
+    """Lecture d'un snapshot binaire. Les tableaux sont chargés par memory-mapping,
+        à la demande, lors du premier accès
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): dossier du snapshot
+        """
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+
+        if self.meta["version"] != SNAPSHOT_VERSION:
+            raise ValueError(
+                f"unsupported snapshot version : {self.meta['version']}")
+
+        self.num_papers = self.meta["num_papers"]
+        self.num_nodes = self.meta["num_nodes"]
+        self._arrays = {}
+        self._string_tables = {}
+
+    def __len__(self):
+        return self.num_papers
+
+    def array(self, name):
+        """
+        Args:
+            name (str): nom du tableau (ex : "ref_indptr", "date", "category_codes")
+
+        Returns:
+            np.ndarray: tableau en lecture seule, sans copie
+        """
+        if name not in self._arrays:
+            file_path = os.path.join(self.path, name + ".npy")
+            try:
+                self._arrays[name] = np.load(file_path, mmap_mode="r")
+            except ValueError:
+                # un tableau vide ne peut pas être mappé en mémoire
+                self._arrays[name] = np.load(file_path)
+        return self._arrays[name]
+
+    def string_table(self, name):
+        if name not in self._string_tables:
+            sorted_index = None
+            if os.path.exists(os.path.join(self.path, name + "_sorted.npy")):
+                sorted_index = self.array(name + "_sorted")
+
+            self._string_tables[name] = StringTable(
+                self.array(name + "_bytes"), self.array(name + "_offsets"),
+                sorted_index
+            )
+        return self._string_tables[name]
+
+    @property
+    def dois(self):
+        """StringTable: DOI de chaque noeud, les papiers du dataset en premier"""
+        return self.string_table("doi")
+
+    @property
+    def dates(self):
+        return self.array("date")
+
+    @property
+    def category_codes(self):
+        return self.array("category_codes")
+
+    @property
+    def categories(self):
+        return self.string_table("category")
+
+    @property
+    def publisher_codes(self):
+        return self.array("publisher_codes")
+
+    @property
+    def publishers(self):
+        return self.string_table("publisher")
+
+    @property
+    def keywords(self):
+        return self.string_table("keyword")
+
+    @property
+    def author_names(self):
+        return self.string_table("author_name")
+
+    def doi_index(self, doi):
+        """
+        Args:
+            doi (str): DOI recherché
+
+        Returns:
+            int: indice du noeud, -1 si absent
+        """
+        return self.dois.index(doi)
+
+    def _csr_row(self, name, i):
+        indptr = self.array(name + "_indptr")
+        return self.array(name + "_indices")[indptr[i]:indptr[i + 1]]
+
+    def references(self, i):
+        """
+        Args:
+            i (int): indice du papier
+
+        Returns:
+            np.ndarray[int32]: indices des noeuds cités par le papier
+        """
+        return self._csr_row("ref", i)
+
+    def keyword_ids(self, i):
+        return self._csr_row("keyword", i)
+
+    def author_ids(self, i):
+        return self._csr_row("author", i)
+
+    def paper(self, i):
+        """Reconstruit un papier au format du dataset JSON
+
+        Args:
+            i (int): indice du papier
+
+        Returns:
+            dict: papier, avec la clé "doi" si le dataset d'origine était une liste
+        """
+        paper = json.loads(self.string_table("extra")[i])
+        present_mask = int(self.array("present")[i])
+
+        def is_present(bit):
+            return present_mask & (1 << bit) != 0
+
+        if is_present(COLUMN_FIELDS.index("date")):
+            if not np.isnat(self.dates[i]):
+                paper["date"] = str(self.dates[i])
+            else:
+                paper.setdefault("date", None)
+
+        if is_present(COLUMN_FIELDS.index("arxiv_category")):
+            category_code = self.category_codes[i]
+            paper["arxiv_category"] = None if category_code < 0 else self.categories[category_code]
+
+        if is_present(COLUMN_FIELDS.index("publisher")):
+            publisher_code = self.publisher_codes[i]
+            paper["publisher"] = None if publisher_code < 0 else self.publishers[publisher_code]
+
+        if is_present(COLUMN_FIELDS.index("key_words")):
+            paper["key_words"] = [self.keywords[k] for k in self.keyword_ids(i)]
+
+        if is_present(COLUMN_FIELDS.index("authors")):
+            organisations = self.string_table("author_organisation")
+            paper["authors"] = [
+                {
+                    "name": self.author_names[a],
+                    "organisation": json.loads(organisations[a])
+                }
+                for a in self.author_ids(i)
+            ]
+
+        if is_present(REFERENCE_BIT):
+            paper[self.meta["reference_key"]] = [self.dois[j] for j in self.references(i)]
+
+        if self.meta["layout"] == "list":
+            paper["doi"] = self.dois[i]
+
+        return paper
+
+    def to_dataset(self):
+        """
+        Returns:
+            dict | list: dataset complet, dans la disposition du JSON d'origine
+        """
+        if self.meta["layout"] == "dict":
+            return {self.dois[i]: self.paper(i) for i in range(self.num_papers)}
+        return [self.paper(i) for i in range(self.num_papers)]
+
+    def to_json(self, json_path):
+        with open(json_path, "bw") as f:
+            f.write(
+                json.dumps(self.to_dataset(), ensure_ascii=False).encode("utf-8")
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="conversion entre le dataset JSON et le snapshot binaire")
+    parser.add_argument("source")
+    parser.add_argument("destination")
+    parser.add_argument("--to-json", action="store_true",
+                        help="convertit le snapshot source en dataset JSON")
+    args = parser.parse_args()
+
+    if args.to_json:
+        GraphSnapshot(args.source).to_json(args.destination)
+    else:
+        convert_json(args.source, args.destination)
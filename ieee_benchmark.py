@@ -0,0 +1,112 @@
+import os
+import re
+import time
+import argparse
+
+from bs4 import BeautifulSoup
+
+import ieee_scrapper
+
+"""
+
+    Benchmark de l'extraction des références sur un corpus de pages IEEE enregistrées
+    (voir le paramètre pages_dir de ieee_scrapper.IEEE_scrapper).
+
+    Compare, pour chaque page, le temps CPU de l'extraction d'origine (arbre BeautifulSoup
+    complet, filtre de classe en lambda, puis re.findall sur chaque span) à celui de
+    ieee_scrapper.extract_reference_titles (XPath lxml), et vérifie que les titres
+    extraits sont identiques.
+
+        $ python3 ieee_benchmark.py ieee_pages/ --repeat 5
+
+"""
+
+
+def legacy_extract_reference_titles(html_page):
+    """Extraction d'origine : IEEE_scrapper._scrapp_page puis _scrapp_from_publisher_name
+
+    Args:
+        html_page (str): contenu de la page des références
+
+    Returns:
+        list[str]: titres des références, None si la page ne comporte aucune référence
+    """
+    soup = BeautifulSoup(html_page, "lxml")
+
+    ref_list = soup.find_all("div", class_="reference-container")
+    if len(ref_list) == 0:
+        return None
+
+    ref_title_list = []
+    for ref in ref_list:
+        ref_span = ref.find("span", class_=lambda x: x != "number")
+        references_name = re.findall(r'"(.+)"', ref_span.text)
+        if len(references_name) == 0:
+            continue
+        ref_title_list.append(references_name[0])
+
+    return ref_title_list
+
+
+def cpu_time(extract_function, html_page, repeat):
+    """
+    Returns:
+        tuple: (meilleur temps CPU en secondes, résultat de l'extraction)
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.process_time()
+        result = extract_function(html_page)
+        elapsed = time.process_time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+
+    return best, result
+
+
+def run_benchmark(pages_dir, repeat):
+    page_names = sorted(
+        name for name in os.listdir(pages_dir) if name.endswith(".html")
+    )
+    if len(page_names) == 0:
+        print("no .html page in ", pages_dir)
+        return
+
+    total_legacy = 0
+    total_lxml = 0
+    num_mismatch = 0
+
+    print(f"{'page':<50} {'refs':>5} {'bs4 (ms)':>10} {'lxml (ms)':>10} {'speedup':>8}")
+    for name in page_names:
+        with open(os.path.join(pages_dir, name), encoding="utf-8") as f:
+            html_page = f.read()
+
+        legacy_time, legacy_result = cpu_time(
+            legacy_extract_reference_titles, html_page, repeat)
+        lxml_time, lxml_result = cpu_time(
+            ieee_scrapper.extract_reference_titles, html_page, repeat)
+
+        total_legacy += legacy_time
+        total_lxml += lxml_time
+        if legacy_result != lxml_result:
+            num_mismatch += 1
+
+        num_refs = len(lxml_result) if lxml_result is not None else 0
+        print(f"{name[:50]:<50} {num_refs:>5} {legacy_time * 1e3:>10.2f} {lxml_time * 1e3:>10.2f}"
+              f" {legacy_time / max(lxml_time, 1e-9):>7.1f}x")
+
+    num_pages = len(page_names)
+    print(f"\n{num_pages} pages, mean CPU time per page : bs4 {total_legacy / num_pages * 1e3:.2f} ms,"
+          f" lxml {total_lxml / num_pages * 1e3:.2f} ms"
+          f" ({total_legacy / max(total_lxml, 1e-9):.1f}x), {num_mismatch} mismatching pages")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="benchmark de l'extraction des références IEEE")
+    parser.add_argument("pages_dir", help="dossier des pages IEEE enregistrées (.html)")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="nombre de mesures par page, la meilleure est retenue")
+    args = parser.parse_args()
+
+    run_benchmark(args.pages_dir, args.repeat)
@@ -1,10 +1,14 @@
 import os
+import re
 import asyncio
 import traceback
 import requests
 
 import pyppeteer
-from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
+
+import tracing
 
 
 EXECUTABLE_PATH = "/usr/bin/chromium-browser"
@@ -31,6 +35,45 @@ request_header = {
 }
 
 
+# premier span de chaque bloc de référence, hors numéro de la référence
+REFERENCE_SPAN_XPATH = etree.XPath(
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' reference-container ')]"
+    "/descendant::span[not(normalize-space(@class) = 'number')][1]"
+)
+# le titre de la référence est entre guillemets dans le texte du span
+REFERENCE_TITLE_REGEX = re.compile(r'"(.+)"')
+
+
+def extract_reference_titles(html_page):
+    """Extrait les titres des références d'une page IEEE, en une seule requête XPath
+        sur l'arbre lxml (sans construire d'arbre BeautifulSoup).
+        Fonction bloquante, à exécuter dans un thread ou un processus séparé
+
+    Args:
+        html_page (str): contenu de la page des références
+
+    Returns:
+        list[str]: titres des références, None si la page ne comporte aucune référence
+    """
+    try:
+        tree = lxml.html.document_fromstring(html_page)
+    except etree.ParserError:
+        # page vide ou ne contenant que des espaces
+        return None
+
+    ref_span_list = REFERENCE_SPAN_XPATH(tree)
+    if len(ref_span_list) == 0:
+        return None
+
+    ref_title_list = []
+    for ref_span in ref_span_list:
+        ref_title = REFERENCE_TITLE_REGEX.search(ref_span.text_content())
+        if ref_title is not None:
+            ref_title_list.append(ref_title.group(1))
+
+    return ref_title_list
+
+
 class IEEE_scrapper():
     """classe implémentant un scrapper du site de l'éditeur IEEE.
        Le scrapping consiste à récupérer la liste des références d'un papier, à partir de son DOI.
@@ -38,18 +81,28 @@ class IEEE_scrapper():
        Le site IEEE utilisant JS, la page doit être chargée à partir d'un navigateur headless (usage de pyppeteer)
     """
 
-    def __init__(self, path, request_header, timeout=5):
+    def __init__(self, path, request_header, timeout=5, executor=None, pages_dir=None,
+                 tracer=None):
         """
         Args:
             path (str): chemin du navigateur
             request_header (str): header pour les requetes GET
             timeout (int, optional): timeout avant abandon de requete. Defaults to 5.
+            executor (concurrent.futures.Executor, optional): executor dans lequel l'extraction
+                des références est faite, None pour le pool de threads par défaut. Defaults to None.
+            pages_dir (str, optional): dossier où enregistrer les pages chargées (corpus pour
+                ieee_benchmark.py), None pour ne pas les enregistrer. Defaults to None.
+            tracer (tracing.Tracer, optional): traçage du scrapping, aucun si None. Defaults to None.
         """
         self.path = path
         self.request_header = request_header
         self.doi_org_url = "https://doi.org/api/handles/"
         self.timeout = timeout
+        self.executor = executor
+        self.pages_dir = pages_dir
+        self.tracer = tracer if tracer is not None else tracing.NullTracer()
 
+    @tracing.traced("ieee_get_page")
     async def get_page(self, doi, browser):
         """Traduit le DOI d'un papier en lien vers le site de l'éditeur, via le site doi.org
             La page est ensuite chargé dans le navigateur
@@ -65,9 +118,11 @@ class IEEE_scrapper():
 
         doi_resolved_url = self.doi_org_url + doi
         try:
-            response = requests.get(
-                doi_resolved_url, timeout=self.timeout
-            ).json()
+            # requête synchrone : bloque la boucle d'évènements
+            with self.tracer.span("doi.org (blocking)", url=doi_resolved_url):
+                response = requests.get(
+                    doi_resolved_url, timeout=self.timeout
+                ).json()
 
         except requests.exceptions.Timeout:
             print("doi timeout")
@@ -83,7 +138,8 @@ class IEEE_scrapper():
             return 0
 
         try:
-            await page.goto(url, {'waitUntil': 'load'}, header=self.request_header)
+            with self.tracer.span("page.goto", url=url):
+                await page.goto(url, {'waitUntil': 'load'}, header=self.request_header)
         except pyppeteer.errors.TimeoutError:
             return
         except:
@@ -94,6 +150,7 @@ class IEEE_scrapper():
         finally:
             await page.close()
 
+    @tracing.traced("ieee_scrapp_page")
     async def _scrapp_page(self, doi):
         """scrapping des références du papier
 
@@ -101,7 +158,7 @@ class IEEE_scrapper():
             doi (str): DOI du papier
 
         Returns:
-            list[str]: liste des titre des références, affichées sur la page du papier, sur le site IEEE
+            list[str]: liste des titres des références, affichées sur la page du papier, sur le site IEEE
         """
         browser = await pyppeteer.launch(
             headless=True, args=['--no-sandbox'],
@@ -110,23 +167,22 @@ class IEEE_scrapper():
         html_page = await self.get_page(doi, browser)
         await browser.close()
 
-        if html_page is None:
+        if not html_page:
             return None
 
-        soup = BeautifulSoup(html_page, "lxml")
-
-        ref_list = soup.find_all("div", class_="reference-container")
-        if len(ref_list) > 0:
-            ref_text_list = []
-            for ref in ref_list:
-                ref_span = ref.find("span", class_=lambda x: x != "number")
-                ref_text = ref_span.text
-                ref_text_list.append(ref_text)
+        if self.pages_dir is not None:
+            page_path = os.path.join(self.pages_dir, doi.replace("/", "_") + ".html")
+            with open(page_path, "w", encoding="utf-8") as f:
+                f.write(html_page)
 
-            return ref_text_list
-        else:
+        with self.tracer.span("extract_reference_titles"):
+            ref_title_list = await asyncio.get_running_loop().run_in_executor(
+                self.executor, extract_reference_titles, html_page
+            )
+        if ref_title_list is None:
             print('scrap failed')
-            return None
+
+        return ref_title_list
 
     def scrapp_page(self, url):
         asyncio.run(self._scrapp_page(url))
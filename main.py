@@ -1,6 +1,7 @@
 import asyncio
 import time
 import re
+import itertools
 import json
 from difflib import SequenceMatcher
 import copy
@@ -11,6 +12,9 @@ import paperswithcode
 import feedparser
 
 import ieee_scrapper
+import crawl_frontier
+import reference_cache
+import tracing
 
 """
 
@@ -41,6 +45,13 @@ import ieee_scrapper
         $ pip install -r requirements.txt
         $ python3 main.py
 
+    Utilisation comme bibliothèque : PaperGraphCreator.crawl renvoie les papiers un par un,
+    dès que leurs références sont résolues, sans conserver tout le dataset en mémoire
+
+        creator = PaperGraphCreator(ARXIV_API, CROSS_REF_API, MAIL_TO, KNOWN_PUBLISHER_LIST, scrapp=False)
+        async for paper in creator.crawl(creator.pwc_client.paper_list(page=1).results):
+            ...
+
 
 """
 
@@ -48,7 +59,9 @@ import ieee_scrapper
 class PaperGraphCreator():
     def __init__(self, arxiv_api, cross_ref_api, mail_to, known_publisher_list,
                  max_item=50, get_timeout=5, scrapp=True, max_tcp_conn=50,
-                 max_reference=50):
+                 max_reference=50, max_depth=1, request_budget=None,
+                 reference_cache_path=None, ieee_executable_path=ieee_scrapper.EXECUTABLE_PATH,
+                 trace_path=None, trace_slow_callbacks=False):
         """
 
         Args:
@@ -71,6 +84,26 @@ class PaperGraphCreator():
             max_tcp_conn (int, optional): Nombre max de connections TCP permises simultanément. Defaults to 50.
 
             max_reference (int, optional): Nombre max de références prises en compte pour un papier. Defaults to 50.
+
+            max_depth (int, optional): Profondeur max de la collecte, les papiers papers with code étant
+                à la profondeur 0 et leurs références à la profondeur 1. Au delà de 1, les références des
+                références sont étendues via la frontière de collecte. Defaults to 1.
+
+            request_budget (int, optional): Nombre total de requêtes consacrées à l'expansion de la
+                frontière, None pour aucune limite. Defaults to None.
+
+            reference_cache_path (str, optional): Fichier du cache des références non structurées
+                déjà résolues (ou sans correspondance), réutilisé d'une exécution à l'autre.
+                None pour un cache limité à l'exécution en cours. Defaults to None.
+
+            ieee_executable_path (str, optional): chemin du navigateur chromium utilisé pour le scrapping
+                du site IEEE. Defaults to ieee_scrapper.EXECUTABLE_PATH.
+
+            trace_path (str, optional): Active le traçage de la collecte (spans par papier, retard de la
+                boucle d'évènements), écrit dans ce fichier au format Chrome trace. Defaults to None.
+
+            trace_slow_callbacks (bool, optional): Avec le traçage, active le mode debug d'asyncio pour
+                signaler les callbacks lents (ralentit fortement la boucle). Defaults to False.
         """
 
         self.pwc_client = paperswithcode.PapersWithCodeClient()
@@ -84,12 +117,18 @@ class PaperGraphCreator():
         self.known_publisher_list = known_publisher_list
         self.new_publishers_list = {}
 
+        if trace_path is not None:
+            self.tracer = tracing.Tracer(trace_path, slow_callbacks=trace_slow_callbacks)
+        else:
+            self.tracer = tracing.NullTracer()
+
         self.scrapp = scrapp
         if scrapp is True:
             self.scrappers = {
                 "IEEE": ieee_scrapper.IEEE_scrapper(
-                    IEEE_SCRAPPER_EXECUTABLE_PATH,
-                    ieee_scrapper.request_header
+                    ieee_executable_path,
+                    ieee_scrapper.request_header,
+                    tracer=self.tracer
                 ),
                 "Springer": None,
                 "research_gate": None
@@ -110,9 +149,81 @@ class PaperGraphCreator():
             "reference": []
         }
 
+        self.frontier = crawl_frontier.CrawlFrontier(max_depth, request_budget)
+        self.reference_cache = reference_cache.ReferenceCache(
+            reference_cache_path, normalize=self.clean_title_string
+        )
+
         self.dataset = {}
+        # papiers en cours de collecte : DOI -> nombre de coroutines qui le complètent
+        self.paper_holders = {}
+        # mode crawl : les papiers terminés sont envoyés dans la file puis retirés du dataset
+        self.output_queue = None
+        # DOIs des papiers en attente d'une place dans la file, puis des papiers lus
+        self.pending_dois = set()
+        self.released_dois = set()
+
         self.num_papers = 0
         self.num_references = 0
+        self.num_requests = 0
+
+    def is_known(self, doi):
+        """
+        Returns:
+            bool: vrai si le papier est dans le dataset, ou a déjà été renvoyé par crawl
+        """
+        return doi in self.dataset or doi in self.pending_dois or doi in self.released_dois
+
+    def _hold_paper(self, doi):
+        self.paper_holders[doi] = self.paper_holders.get(doi, 0) + 1
+
+    async def _release_paper(self, doi):
+        """Signale qu'une coroutine a fini de compléter un papier. Quand plus aucune
+            coroutine ne le complète, le papier est terminé : en mode crawl, il est alors
+            retiré du dataset et envoyé dans la file de sortie (en attendant qu'une place
+            se libère). Il n'est marqué comme renvoyé qu'une fois placé dans la file.
+            Un papier déjà envoyé est marqué comme mise à jour ("update": True)
+
+        Args:
+            doi (str): DOI du papier
+        """
+        self.paper_holders[doi] -= 1
+        if self.paper_holders[doi] > 0:
+            return
+        del self.paper_holders[doi]
+
+        if self.output_queue is None:
+            return
+
+        update = doi in self.pending_dois or doi in self.released_dois
+        paper = {"doi": doi, **self.dataset.pop(doi)}
+        if update:
+            paper["update"] = True
+        else:
+            self.pending_dois.add(doi)
+
+        try:
+            await self.output_queue.put(paper)
+        except asyncio.CancelledError:
+            self._restore_paper(paper)
+            raise
+        finally:
+            if not update:
+                self.pending_dois.discard(doi)
+
+        if not update:
+            self.released_dois.add(doi)
+
+    def _restore_paper(self, paper):
+        """Replace dans le dataset un papier terminé mais jamais lu par le consommateur
+
+        Args:
+            paper (dict): papier tel qu'envoyé dans la file de sortie
+        """
+        doi = paper.pop("doi")
+        if not paper.pop("update", False):
+            self.released_dois.discard(doi)
+        self.dataset[doi] = paper
 
     def clean_title_string(self, title):
         t = title.lower()
@@ -121,6 +232,7 @@ class PaperGraphCreator():
 
         return t
 
+    @tracing.traced("async_get_request")
     async def async_get_request(self, query, aiohttp_session, is_json=True):
         """lance une requête GET avec aiohttp
 
@@ -132,6 +244,8 @@ class PaperGraphCreator():
         Returns:
             : réponses de la requête, None si échec, ou un dictionnaire / xml si succès
         """
+        self.num_requests += 1
+        self.tracer.tag(url=query)
         try:
             result = await aiohttp_session.request(method="GET", url=query)
         except asyncio.exceptions.TimeoutError as e:
@@ -188,27 +302,75 @@ class PaperGraphCreator():
             _type_: None ou dictionnaire json 
         """
 
-        query = f"{CROSS_REF_API}/works?" +\
+        query = f"{self.cross_ref_api}/works?" +\
             f"query.bibliographic={title.replace('&', ' and ')}" +\
             f"&select=DOI,URL,title,subject,publisher,reference,author,event,created,deposited&rows=1" +\
-            f"&mailto={MAIL_TO}"
+            f"&mailto={self.mail_to}"
 
         result_ref = await self.async_get_request(query, aiohttp_session)
 
         return result_ref
 
-    async def parse_paper_dict(self, paper, aiohttp_session, dataset_lock):
+    @tracing.traced("resolve_reference")
+    async def _resolve_reference_title(self, reference, thresh, aiohttp_session, dataset_lock):
+        """Cherche le DOI d'une référence à partir de son titre ou d'une chaîne non structurée,
+            et collecte le papier trouvé. Le résultat est mémorisé dans le cache des références :
+            une référence déjà sans correspondance ne fait aucune requête, une référence déjà
+            résolue n'est ni recherchée ni comparée à nouveau, le papier est seulement collecté
+            à partir de son DOI s'il n'est pas encore connu
+
+        Args:
+            reference (str): titre ou chaîne décrivant la référence
+            thresh (float): seuil de similarité entre la référence et le titre trouvé
+            aiohttp_session (_type_): session
+            dataset_lock (asyncio.Lock): pour l'accès concurent au dataset
+
+        Returns:
+            str: DOI de la référence, None si pas de correspondance
+        """
+        self.tracer.tag(reference=reference)
+        entry = self.reference_cache.get(reference, thresh)
+        if entry is not None:
+            ref_doi = entry["doi"]
+            if ref_doi is None or self.is_known(ref_doi):
+                return ref_doi
+
+            result_ref_content = await self.async_get_request(
+                f"{self.cross_ref_api}/works/{ref_doi}", aiohttp_session)
+            if result_ref_content is not None:
+                await self.parse_paper_dict(result_ref_content, aiohttp_session, dataset_lock)
+            return ref_doi
+
+        result_ref_content = await self.retrieve_paper_from_title(reference, aiohttp_session)
+        if result_ref_content is None:
+            return None
+
+        score = self._title_match_score(result_ref_content["title"][0], reference)
+        # le meilleur résultat est mémorisé même sans correspondance, pour d'autres seuils
+        self.reference_cache.set(reference, result_ref_content["DOI"], score)
+        if score < thresh:
+            return None
+
+        await self.parse_paper_dict(result_ref_content, aiohttp_session, dataset_lock)
+
+        return result_ref_content["DOI"]
+
+    @tracing.traced("parse_paper_dict")
+    async def parse_paper_dict(self, paper, aiohttp_session, dataset_lock, depth=1):
         """Parse les informations d'un papier, cherche la classification sur arxiv, et collecte 
-            la liste des références
+            la liste des références. Les DOIs des références sont ajoutés à la frontière de collecte
 
         Args:
             paper (dict): dict décrivant le papier
             aiohttp_session (_type_): session
             dataset_lock (asyncio.Lock): pour l'accès concurent au dataset
+            depth (int, optional): profondeur du papier dans la collecte. Defaults to 1.
         """
         doi = paper["DOI"]
-        if doi in self.dataset.keys():
+        self.tracer.set_doi(doi)
+        if self.is_known(doi):
             return
+        self._hold_paper(doi)
         self.num_papers += 1
 
         paper_dict = self._parse_result_info(paper, None)
@@ -233,10 +395,15 @@ class PaperGraphCreator():
             self.dataset[doi]["reference"] = ref_doi_list
             dataset_lock.release()
 
+            self.frontier.add_references(ref_doi_list, depth + 1)
+
         self.num_references += len(ref_doi_list)
         print("- got ref paper : ", doi, " with  ",
               len(ref_doi_list), " references")
 
+        await self._release_paper(doi)
+
+    @tracing.traced("_parse_references_list")
     async def _parse_references_list(self, ref_list, aiohttp_session, dataset_lock):
         """Traite la liste des références d'un papier. La liste peut contenir des 
             DOI ou les titre / chaine de caractère non structurée
@@ -264,21 +431,15 @@ class PaperGraphCreator():
                 ).pop()
 
                 unstruct_title = ref[key]
-                result_ref_content = await self.retrieve_paper_from_title(unstruct_title, aiohttp_session)
-
-                if result_ref_content is None:
-                    continue
-
-                matched = self._check_title_match(
-                    result_ref_content["title"][0], unstruct_title, 0.8)
+                ref_doi = await self._resolve_reference_title(
+                    unstruct_title, 0.8, aiohttp_session, dataset_lock)
 
-                if matched:
-                    doi_ref_list.append(result_ref_content["DOI"])
-                    await self.parse_paper_dict(
-                        result_ref_content, aiohttp_session, dataset_lock)
+                if ref_doi is not None:
+                    doi_ref_list.append(ref_doi)
 
         return doi_ref_list
 
+    @tracing.traced("scrapp")
     async def _scrapp_from_publisher_name(self, publisher_name, paper_doi,
                                           aiohttp_session, dataset_lock):
         """Si l'api crossref ne donne pas la liste des références d'un papier,
@@ -310,29 +471,33 @@ class PaperGraphCreator():
 
             doi_ref_list = []
 
-            for references_name in ref_list:
-                references_name = re.findall(r'"(.+)"', references_name)
-                if len(references_name) == 0:
-                    continue
+            for reference_title in ref_list:
+                ref_doi = await self._resolve_reference_title(
+                    reference_title, 0.75, aiohttp_session, dataset_lock)
 
-                result = await self.retrieve_paper_from_title(references_name[0], aiohttp_session)
-
-                if result is None:
-                    continue
-
-                matched = self._check_title_match(
-                    result["title"][0], references_name[0], 0.75)
-
-                if matched is True:
-                    doi_ref_list.append(result["DOI"])
-                    await self.parse_paper_dict(
-                        result, aiohttp_session, dataset_lock)
+                if ref_doi is not None:
+                    doi_ref_list.append(ref_doi)
 
             print("(scrapper) - got : ", paper_doi, " with ",
                   len(doi_ref_list), " referencess")
 
             return doi_ref_list
 
+    @tracing.traced("SequenceMatcher")
+    def _title_match_score(self, title_1, title_2):
+        """Mesure la similitude entre deux titres
+
+        Args:
+            title_1 (str): titre du papier demandé
+            title_2 (str): titre du papier renvoyé par l'api
+
+        Returns:
+            float: similitude entre 0 et 1
+        """
+        t1 = self.clean_title_string(title_1)
+        t2 = self.clean_title_string(title_2)
+        return SequenceMatcher(None, t1, t2).ratio()
+
     def _check_title_match(self, title_1, title_2, thresh):
         """l'API crossref est solicitée avec le titre d'un papier. Pour valider
         le résultat, il faut mesurer la similitude entre le titre demandé et le 
@@ -346,9 +511,7 @@ class PaperGraphCreator():
         Returns:
             bool: vrai ou faux, si les titres sont suffisement similaires ou pas
         """
-        t1 = self.clean_title_string(title_1)
-        t2 = self.clean_title_string(title_2)
-        score = SequenceMatcher(None, t1, t2).ratio()
+        score = self._title_match_score(title_1, title_2)
 
         if score >= thresh:
             return True
@@ -416,6 +579,7 @@ class PaperGraphCreator():
 
         return paper_dict
 
+    @tracing.traced("arxiv")
     async def get_arxiv_info(self, paper_info, aiohttp_session, dataset_lock, paper_doi, by_title=False):
         """Requête vers l'api arxiv, pour chercher la classification d'un papier
 
@@ -427,7 +591,7 @@ class PaperGraphCreator():
             by_title (bool, optional): la recherche se fait soit par titre soi par arxiv_id. Defaults to False.
         """
         if by_title is False:
-            query = f"{ARXIV_API}/query?id_list={paper_info.arxiv_id}"
+            query = f"{self.arxiv_api}/query?id_list={paper_info.arxiv_id}"
             xml = await self.async_get_request(query, aiohttp_session, is_json=False)
             if xml is None:
                 return
@@ -438,7 +602,7 @@ class PaperGraphCreator():
             self.dataset[paper_doi]["language"] = data["summary_detail"]["language"]
             dataset_lock.release()
         else:
-            query = f"{ARXIV_API}/query?search_query=ti:{paper_info}&max_results=1"
+            query = f"{self.arxiv_api}/query?search_query=ti:{paper_info}&max_results=1"
             xml = await self.async_get_request(query, aiohttp_session, is_json=False)
             if xml is None:
                 return
@@ -452,28 +616,31 @@ class PaperGraphCreator():
             self.dataset[paper_doi]["language"] = data["summary_detail"]["language"]
             dataset_lock.release()
 
-    async def collect_paper_from_doi(self, paper_doi, aiohttp_session, dataset_lock):
+    @tracing.traced("collect_paper_from_doi")
+    async def collect_paper_from_doi(self, paper_doi, aiohttp_session, dataset_lock, depth=1):
         """Requête vers l'api Crossref à partir du DOI d'un papier
 
         Args:
             paper_doi (str):
             aiohttp_session (_type_): session
             dataset_lock (asyncio.Lock): pour l'accès concurent au dataset
+            depth (int, optional): profondeur du papier dans la collecte. Defaults to 1.
         """
-        if paper_doi in self.dataset.keys():
+        self.tracer.set_doi(paper_doi)
+        if self.is_known(paper_doi):
             return
 
-        query = f"{CROSS_REF_API}/works/{paper_doi}"
+        query = f"{self.cross_ref_api}/works/{paper_doi}"
         result = await self.async_get_request(query, aiohttp_session)
         if result is None:
             return
 
         title = result["title"][0]
 
-        query = f"{CROSS_REF_API}/works?" +\
+        query = f"{self.cross_ref_api}/works?" +\
             f"query.bibliographic={title.replace('&', ' and ')}" +\
             f"&select=DOI,URL,title,subject,publisher,reference,author,event,created,deposited&rows=1" +\
-            f"&mailto={MAIL_TO}"
+            f"&mailto={self.mail_to}"
 
         result = await self.async_get_request(query, aiohttp_session)
         if result is None:
@@ -481,8 +648,9 @@ class PaperGraphCreator():
 
         matched = self._check_title_match(result["title"][0], title, 0.9)
         if matched:
-            await self.parse_paper_dict(result, aiohttp_session, dataset_lock)
+            await self.parse_paper_dict(result, aiohttp_session, dataset_lock, depth=depth)
 
+    @tracing.traced("collect_paper")
     async def collect_paper(self, paper_info, aiohttp_session, dataset_lock):
         """Collecte l'ensemble des infos sur un papier, ainsi que les infos sur ses références, et ajoute
             le tout au dataset
@@ -496,11 +664,12 @@ class PaperGraphCreator():
             aiohttp_session (_type_): session
             dataset_lock (asyncio.Lock): pour l'accès concurent au dataset
         """
+        self.tracer.tag(title=paper_info.title)
 
-        query = f"{CROSS_REF_API}/works?" +\
+        query = f"{self.cross_ref_api}/works?" +\
             f"query.bibliographic={paper_info.title.replace('&', ' and ')}" +\
             f"&select=DOI,URL,title,subject,publisher,reference,author,event,created,deposited&rows=1" +\
-            f"&mailto={MAIL_TO}"
+            f"&mailto={self.mail_to}"
 
         result = await self.async_get_request(query, aiohttp_session)
         if result is None:
@@ -511,14 +680,17 @@ class PaperGraphCreator():
 
         if matched:
             paper_doi = result["DOI"]
+            self.tracer.set_doi(paper_doi)
 
-            if paper_doi not in self.dataset.keys():
+            if not self.is_known(paper_doi):
                 self.num_papers += 1
+            if paper_doi not in self.dataset.keys():
                 paper_dict = self._parse_result_info(result, paper_info)
 
                 await dataset_lock.acquire()
                 self.dataset[paper_doi] = paper_dict
                 dataset_lock.release()
+            self._hold_paper(paper_doi)
 
             if paper_info.arxiv_id is not None:
                 await self.get_arxiv_info(paper_info, aiohttp_session, dataset_lock, paper_doi)
@@ -542,28 +714,160 @@ class PaperGraphCreator():
             l = len(ref_list) if ref_list is not None else 0
             print("- got pwc paper : ", paper_doi, " with ", l, " referencess")
 
-    async def _start_acquisition(self, papers_chunk):
+            await self._release_paper(paper_doi)
+
+    @tracing.traced("expand_frontier")
+    async def _expand_frontier(self, aiohttp_session, dataset_lock):
+        """Étend la frontière de collecte : les DOIs les plus cités par les papiers déjà
+            collectés sont collectés par blocs, tant que le budget de requêtes le permet.
+            Les références des papiers collectés alimentent à leur tour la frontière.
+
+        Args:
+            aiohttp_session (_type_): session
+            dataset_lock (asyncio.Lock): pour l'accès concurent au dataset
+        """
+        while True:
+            batch_size = self.max_tcp_conn
+            remaining_budget = self.frontier.remaining_budget()
+            if remaining_budget is not None:
+                # collecter un papier à partir de son DOI coûte au plus 3 requêtes (2 crossref, 1 arxiv)
+                batch_size = min(batch_size, remaining_budget // 3)
+
+            if batch_size == 0:
+                return
+
+            batch = self.frontier.pop_batch(batch_size, self.is_known)
+            if len(batch) == 0:
+                return
+
+            num_requests = self.num_requests
+            await asyncio.gather(*[
+                self.collect_paper_from_doi(
+                    doi, aiohttp_session, dataset_lock, depth=depth)
+                for doi, depth in batch
+            ])
+            self.frontier.spend(self.num_requests - num_requests)
+
+    def coverage(self):
+        """Mesure la couverture du graphe : une arête est résolue si le papier cité
+            est présent dans le dataset
+
+        Returns:
+            tuple[int, int]: nombre d'arêtes résolues, nombre total d'arêtes
+        """
+        num_edges = 0
+        num_resolved = 0
+        for paper in self.dataset.values():
+            for ref_doi in paper["reference"]:
+                num_edges += 1
+                if ref_doi in self.dataset:
+                    num_resolved += 1
+
+        return num_resolved, num_edges
+
+    async def _start_acquisition(self, papers):
         """Lance la collecte d'informations à partir d'un bloc de papiers, fourni par l'api papers with code
             La collecte des infos de ce bloc de papier est faite en asynchrone
             Une fois la collecte terminée, le programme passe à un bloc suivant.
 
         Args:
-            papers_chunk: objet comportant le titre + quelques infos sur un bloc de papiers, venant de papers with code
+            papers (list): titre + quelques infos sur un bloc de papiers, venant de papers with code
         """
 
         timeout = aiohttp.ClientTimeout(total=self.get_timeout)
 
-        connector = aiohttp.TCPConnector(limit=self.max_tcp_conn)
-        async with aiohttp.ClientSession(timeout=timeout, connector=connector) as aiohttp_session:
+        loop_monitor = self.tracer.start_loop_monitor()
+        try:
+            connector = aiohttp.TCPConnector(limit=self.max_tcp_conn)
+            async with aiohttp.ClientSession(timeout=timeout, connector=connector) as aiohttp_session:
 
-            dataset_lock = asyncio.Lock()
-            corountines_list = []
+                dataset_lock = asyncio.Lock()
+                corountines_list = []
 
-            for paper in papers_chunk.results:
-                corountines_list.append(
-                    self.collect_paper(paper, aiohttp_session, dataset_lock)
-                )
-            await asyncio.gather(*corountines_list)
+                for paper in papers:
+                    corountines_list.append(
+                        self.collect_paper(paper, aiohttp_session, dataset_lock)
+                    )
+                await asyncio.gather(*corountines_list)
+
+                await self._expand_frontier(aiohttp_session, dataset_lock)
+        finally:
+            await self.tracer.stop_loop_monitor(loop_monitor)
+
+    async def crawl(self, seeds, queue_size=None):
+        """Collecte les papiers à partir d'une liste de papiers de départ, et les renvoie un par un
+            dès qu'ils sont terminés (références résolues), au lieu de les conserver dans le dataset.
+            Les papiers de départ sont traités par blocs de max_item. Quand la file de sortie est
+            pleine, la collecte est suspendue jusqu'à ce que le consommateur lise les papiers.
+
+            Un papier de départ déjà renvoyé en tant que référence est renvoyé une seconde fois,
+            complété par ses infos papers with code et ses références, avec la clé "update" à True :
+            le consommateur doit alors remplacer le papier déjà reçu sous ce DOI.
+
+            Si le consommateur s'arrête avant la fin (break), la collecte est interrompue : les
+            papiers en cours de collecte ou terminés mais pas encore lus restent dans le dataset.
+
+                async for paper in creator.crawl(seeds):
+                    ...
+
+        Args:
+            seeds (iterable): papiers de départ, venant de papers with code (ex : paper_list(...).results)
+            queue_size (int, optional): nombre max de papiers terminés en attente de lecture,
+                max_item si None. Defaults to None.
+
+        Yields:
+            dict: papier au format du dataset, avec sa clé "doi" (et "update" pour une mise à jour)
+        """
+        if self.output_queue is not None:
+            raise RuntimeError("a crawl is already running")
+
+        if queue_size is None:
+            queue_size = self.max_item
+        output_queue = asyncio.Queue(maxsize=queue_size)
+        end_of_crawl = object()
+
+        async def produce():
+            seeds_iterator = iter(seeds)
+            try:
+                while True:
+                    papers = list(itertools.islice(seeds_iterator, self.max_item))
+                    if len(papers) == 0:
+                        break
+                    await self._start_acquisition(papers)
+                    self.reference_cache.save()
+            except Exception:
+                await output_queue.put(end_of_crawl)
+                raise
+            await output_queue.put(end_of_crawl)
+
+        self.output_queue = output_queue
+        producer = asyncio.ensure_future(produce())
+        try:
+            while True:
+                paper = await output_queue.get()
+                if paper is end_of_crawl:
+                    break
+                yield paper
+
+            # propage une éventuelle erreur de la collecte
+            await producer
+        finally:
+            if not producer.done():
+                producer.cancel()
+                try:
+                    await producer
+                except asyncio.CancelledError:
+                    pass
+                # les papiers interrompus restent dans le dataset, sans être renvoyés
+                self.paper_holders.clear()
+            # de même pour les papiers terminés mais pas encore lus
+            while not output_queue.empty():
+                paper = output_queue.get_nowait()
+                if paper is not end_of_crawl:
+                    self._restore_paper(paper)
+            self.output_queue = None
+            self.reference_cache.save()
+            self.tracer.save()
 
     def start(self):
         """Itère sur l'ensemble des papiers disponibles via l'api papers with code, bloc par bloc.
@@ -585,7 +889,7 @@ class PaperGraphCreator():
             print("\n___________ page num : ", page_num)
             self.time_start = time.perf_counter()
 
-            asyncio.run(self._start_acquisition(papers_chunk))
+            asyncio.run(self._start_acquisition(papers_chunk.results))
             print("\n__________ publisher_name \n", end=" ")
 
             for k in self.new_publishers_list.keys():
@@ -594,8 +898,16 @@ class PaperGraphCreator():
             print(
                 f"\n___________ chunk completed : papers: {len(self.dataset)} ref:{self.num_references}")
 
+            num_resolved, num_edges = self.coverage()
+            print(
+                f"coverage : {num_resolved}/{num_edges} edges resolved with {self.num_requests} requests"
+                f" ({num_resolved / max(self.num_requests, 1):.3f} edges/request),"
+                f" frontier : {len(self.frontier)} dois, {self.frontier.requests_spent} requests spent")
+            print(f"reference cache : {self.reference_cache.stats()}")
+
             # entre chaque bloc, les donénes sont écrites
-            with open('dataset_test.json', "bw") as f:
+            self.reference_cache.save()
+            with self.tracer.span("checkpoint"), open('dataset_test.json', "bw") as f:
                 f.write(
                     json.dumps(
                         self.dataset, ensure_ascii=False
@@ -603,18 +915,21 @@ class PaperGraphCreator():
                 )
                 print(
                     f"{self.num_papers} papers and {self.num_references} refs in {time.perf_counter() - self.time_start} sec")
+            self.tracer.save()
 
         self.exit()
 
     def exit(self):
         """Fin de l'acquisition, écriture des données
         """
-        with open('dataset.json', "bw") as f:
+        self.reference_cache.save()
+        with self.tracer.span("checkpoint"), open('dataset.json', "bw") as f:
             f.write(
                 json.dumps(self.dataset, ensure_ascii=False).encode("utf-8")
             )
             print(
                 f"{self.num_papers} papers and {self.num_references} refs in {time.perf_counter() - self.time_start} sec")
+        self.tracer.save()
 
     def __enter__(self):
         return self
@@ -633,8 +948,18 @@ if __name__ == '__main__':
     MAX_TCP_CONNECTIONS = 40
     GET_TIMEOUT = 5
     MAX_REFERENCES = 50
-
-    IEEE_SCRAPPER_EXECUTABLE_PATH = "/usr/bin/chromium-browser"
+    # profondeur max de la collecte (1 : références directes des papiers PWC uniquement)
+    MAX_DEPTH = 1
+    # budget de requêtes pour l'expansion de la frontière (None : pas de limite)
+    REQUEST_BUDGET = None
+    # cache des références non structurées, conservé d'une exécution à l'autre
+    REFERENCE_CACHE_PATH = "reference_cache.json"
+    # fichier de trace Chrome / Perfetto (https://ui.perfetto.dev), None pour désactiver le traçage
+    TRACE_PATH = None
+    # signale aussi les callbacks lents via le mode debug d'asyncio (ralentit la collecte)
+    TRACE_SLOW_CALLBACKS = False
+
+    IEEE_SCRAPPER_EXECUTABLE_PATH = ieee_scrapper.EXECUTABLE_PATH
 
     KNOWN_PUBLISHER_LIST = [
         "IEEE", "Institute of Electrical and Electronics Engineers (IEEE)"
@@ -643,6 +968,10 @@ if __name__ == '__main__':
     app = PaperGraphCreator(
         ARXIV_API, CROSS_REF_API, MAIL_TO, KNOWN_PUBLISHER_LIST,
         max_item=MAX_ITEM, get_timeout=GET_TIMEOUT, scrapp=True,
-        max_tcp_conn=MAX_TCP_CONNECTIONS, max_reference=MAX_REFERENCES)
+        max_tcp_conn=MAX_TCP_CONNECTIONS, max_reference=MAX_REFERENCES,
+        max_depth=MAX_DEPTH, request_budget=REQUEST_BUDGET,
+        reference_cache_path=REFERENCE_CACHE_PATH,
+        ieee_executable_path=IEEE_SCRAPPER_EXECUTABLE_PATH,
+        trace_path=TRACE_PATH, trace_slow_callbacks=TRACE_SLOW_CALLBACKS)
 
     app.start()
@@ -0,0 +1,97 @@
+import os
+import json
+
+"""
+
+    Cache persistant des références non structurées résolues via l'API Crossref.
+
+    Une même chaîne de référence ("Deep residual learning for image recognition"...)
+    apparaît dans de nombreux papiers. Le résultat de la recherche Crossref est
+    mémorisé, indexé par la chaîne normalisée : le DOI du meilleur résultat et la
+    similarité de son titre avec la référence, même si elle est insuffisante. La
+    correspondance est décidée à la lecture, selon le seuil demandé : une même chaîne
+    peut ainsi être validée avec des seuils différents (références Crossref, titres
+    scrappés sur IEEE), et un changement de seuil ne demande aucune nouvelle requête.
+
+"""
+
+CACHE_VERSION = 3
+
+
+class ReferenceCache():
+    def __init__(self, path=None, normalize=None):
+        """
+        Args:
+            path (str, optional): fichier JSON du cache, chargé s'il existe, None pour un cache
+                limité à l'exécution en cours. Defaults to None.
+            normalize (callable, optional): normalisation des chaînes de référence avant
+                indexation (ex : PaperGraphCreator.clean_title_string). Defaults to None.
+        """
+        self.path = path
+        self.normalize = normalize
+        self.entries = {}
+
+        self.num_hits = 0
+        self.num_misses = 0
+
+        if path is not None and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                content = json.load(f)
+            if content["version"] == CACHE_VERSION:
+                self.entries = content["entries"]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _key(self, reference):
+        if self.normalize is not None:
+            reference = self.normalize(reference)
+        return " ".join(reference.split())
+
+    def get(self, reference, thresh):
+        """
+        Args:
+            reference (str): chaîne de référence
+            thresh (float): seuil de similarité utilisé pour valider le résultat
+
+        Returns:
+            dict: None si absente, sinon {"doi": DOI ou None si la similarité est
+                inférieure au seuil, "score": similarité des titres}
+        """
+        entry = self.entries.get(self._key(reference))
+        if entry is None:
+            self.num_misses += 1
+            return None
+
+        self.num_hits += 1
+        doi = entry["doi"] if entry["score"] >= thresh else None
+        return {"doi": doi, "score": entry["score"]}
+
+    def set(self, reference, doi, score):
+        """
+        Args:
+            reference (str): chaîne de référence
+            doi (str): DOI du meilleur résultat de la recherche, même sans correspondance
+            score (float): similarité entre la référence et le titre trouvé
+        """
+        self.entries[self._key(reference)] = {"doi": doi, "score": round(score, 4)}
+
+    def save(self):
+        """Écrit le cache sur disque, via un fichier temporaire pour ne pas corrompre
+            le cache existant en cas d'interruption
+        """
+        if self.path is None:
+            return
+
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "bw") as f:
+            f.write(
+                json.dumps(
+                    {"version": CACHE_VERSION, "entries": self.entries},
+                    ensure_ascii=False
+                ).encode("utf-8")
+            )
+        os.replace(tmp_path, self.path)
+
+    def stats(self):
+        return f"{len(self.entries)} entries, {self.num_hits} hits, {self.num_misses} misses"
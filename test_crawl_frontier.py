@@ -0,0 +1,44 @@
+from crawl_frontier import CrawlFrontier
+
+
+def test_queued_doi_cited_beyond_max_depth_keeps_its_priority():
+    frontier = CrawlFrontier(max_depth=2)
+
+    frontier.add_references(["y", "z"], 2)
+    # citation depuis un papier à la profondeur max : y n'est pas perdu
+    frontier.add_references(["y"], 3)
+
+    assert frontier.pop_batch(1, lambda doi: False) == [("y", 2)]
+    assert frontier.pop_batch(1, lambda doi: False) == [("z", 2)]
+    assert len(frontier) == 0
+
+
+def test_new_doi_beyond_max_depth_is_not_queued():
+    frontier = CrawlFrontier(max_depth=2)
+
+    frontier.add_references(["w"], 3)
+
+    assert "w" not in frontier.in_degree
+    assert frontier.pop_batch(10, lambda doi: False) == []
+
+
+def test_expanded_doi_is_not_queued_again():
+    frontier = CrawlFrontier(max_depth=2)
+
+    frontier.add_references(["x"], 2)
+    assert frontier.pop_batch(10, lambda doi: False) == [("x", 2)]
+
+    # collecte de x échouée : x n'est toujours pas connu, mais n'est pas réessayé
+    frontier.add_references(["x", "x"], 2)
+
+    assert len(frontier) == 0
+    assert frontier.pop_batch(10, lambda doi: False) == []
+
+
+def test_references_are_not_counted_without_expansion():
+    frontier = CrawlFrontier(max_depth=1)
+
+    frontier.add_references(["x", "y"], 2)
+
+    assert frontier.in_degree == {}
+    assert len(frontier) == 0
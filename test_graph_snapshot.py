@@ -0,0 +1,30 @@
+import os
+import json
+
+import graph_snapshot
+
+
+def test_round_trip_keeps_only_original_keys(tmp_path):
+    dataset_path = os.path.join(os.path.dirname(__file__), "test_dataset.json")
+    with open(dataset_path, encoding="utf-8") as f:
+        dataset = json.load(f)
+
+    graph_snapshot.write_snapshot(dataset, str(tmp_path))
+
+    assert graph_snapshot.GraphSnapshot(str(tmp_path)).to_dataset() == dataset
+
+
+def test_round_trip_missing_and_null_fields(tmp_path):
+    dataset = {
+        "10.1/a": {
+            "title": "a", "date": "2021-02-03", "arxiv_category": "cs.CV",
+            "key_words": None, "reference": ["10.1/b", "10.1/c"]
+        },
+        "10.1/b": {"title": "b", "date": "None", "publisher": None}
+    }
+
+    graph_snapshot.write_snapshot(dataset, str(tmp_path))
+    snapshot = graph_snapshot.GraphSnapshot(str(tmp_path))
+
+    assert snapshot.to_dataset() == dataset
+    assert snapshot.doi_index("10.1/c") == 2
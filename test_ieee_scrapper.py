@@ -0,0 +1,39 @@
+import ieee_benchmark
+import ieee_scrapper
+
+REFERENCES_PAGE = """
+<html><body>
+<div class="reference-container col-12">
+    <span class="number"><b>1.</b></span>
+    <span>K. He et al., "Deep <i>residual</i> learning for image recognition", <i>CVPR</i>, 2016.</span>
+</div>
+<div class="reference-container">
+    <span class="number">2.</span>
+    <span class="col">D. P. Kingma and J. Ba, "Adam: A method for stochastic optimization", 2014.</span>
+</div>
+<div class="col reference-container">
+    <span class="number">3.</span>
+    <span>Technical report without quoted title, 2019.</span>
+</div>
+<div class="reference-container">
+    <span class="number">4.</span>
+    <span><a href="#">S. Ioffe</a>, "Batch normalization", <b>ICML</b>, 2015.</span>
+</div>
+</body></html>
+"""
+
+
+def test_extraction_matches_legacy_extraction():
+    ref_title_list = ieee_scrapper.extract_reference_titles(REFERENCES_PAGE)
+
+    assert ref_title_list == [
+        "Deep residual learning for image recognition",
+        "Adam: A method for stochastic optimization",
+        "Batch normalization",
+    ]
+    assert ref_title_list == ieee_benchmark.legacy_extract_reference_titles(REFERENCES_PAGE)
+
+
+def test_page_without_references():
+    assert ieee_scrapper.extract_reference_titles("<html><body></body></html>") is None
+    assert ieee_scrapper.extract_reference_titles("  \n ") is None
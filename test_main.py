@@ -0,0 +1,109 @@
+import asyncio
+import types
+
+import main
+
+
+def make_creator(responses, **kwargs):
+    """Crée un PaperGraphCreator dont les requêtes GET sont simulées
+
+    Args:
+        responses (dict): réponse renvoyée pour chaque requête, par url
+    """
+    creator = main.PaperGraphCreator(
+        "arxiv", "crossref", "mail", [], scrapp=False, **kwargs)
+    creator.queries = []
+
+    async def fake_get_request(query, aiohttp_session, is_json=True):
+        creator.queries.append(query)
+        if not is_json:
+            return None
+        return responses.get(query.split("&")[0])
+
+    creator.async_get_request = fake_get_request
+    return creator
+
+
+def search_query(title):
+    return f"crossref/works?query.bibliographic={title}"
+
+
+def test_cached_reference_skips_search_in_later_run(tmp_path):
+    cache_path = str(tmp_path / "reference_cache.json")
+    reference = "Deep residual learning for image recognition"
+    paper = {"DOI": "10/resnet", "title": [reference]}
+
+    creator = make_creator({search_query(reference): paper}, reference_cache_path=cache_path)
+    doi = asyncio.run(creator._resolve_reference_title(reference, 0.8, None, asyncio.Lock()))
+    assert doi == "10/resnet"
+    creator.reference_cache.save()
+
+    creator = make_creator({"crossref/works/10/resnet": paper}, reference_cache_path=cache_path)
+    doi = asyncio.run(creator._resolve_reference_title(reference, 0.8, None, asyncio.Lock()))
+
+    assert doi == "10/resnet"
+    assert creator.queries[0] == "crossref/works/10/resnet"
+    assert not any("query.bibliographic" in query for query in creator.queries)
+    assert "10/resnet" in creator.dataset
+
+
+def make_seed(title):
+    return types.SimpleNamespace(title=title, arxiv_id=None, published=None, conference=None)
+
+
+async def collect_crawl(creator, seeds):
+    return [paper async for paper in creator.crawl(seeds)]
+
+
+def test_crawl_saves_reference_cache(tmp_path):
+    cache_path = tmp_path / "reference_cache.json"
+    reference = "Adam: a method for stochastic optimization"
+    responses = {
+        search_query("s0"): {
+            "DOI": "10/s0", "title": ["s0"], "reference": [{"unstructured": reference}]
+        },
+        search_query(reference): {"DOI": "10/adam", "title": [reference]}
+    }
+    creator = make_creator(responses, reference_cache_path=str(cache_path))
+
+    asyncio.run(collect_crawl(creator, [make_seed("s0")]))
+
+    assert main.reference_cache.ReferenceCache(str(cache_path)).entries
+
+
+def test_crawl_marks_seed_already_yielded_as_reference_as_update():
+    responses = {
+        search_query("s0"): {"DOI": "10/s0", "title": ["s0"], "reference": [{"DOI": "10/s1"}]},
+        "crossref/works/10/s1": {"title": ["s1"]},
+        search_query("s1"): {"DOI": "10/s1", "title": ["s1"]}
+    }
+    creator = make_creator(responses, max_item=1)
+
+    papers = asyncio.run(collect_crawl(creator, [make_seed("s0"), make_seed("s1")]))
+
+    assert [(paper["doi"], paper.get("update", False)) for paper in papers] == [
+        ("10/s1", False), ("10/s0", False), ("10/s1", True)
+    ]
+    assert creator.num_papers == 2
+    assert creator.dataset == {}
+
+
+def test_crawl_keeps_unread_papers_when_consumer_stops():
+    responses = {
+        search_query(f"s{i}"): {"DOI": f"10/s{i}", "title": [f"s{i}"]} for i in range(3)
+    }
+    creator = make_creator(responses)
+    seeds = [make_seed(f"s{i}") for i in range(3)]
+
+    async def read_first_paper():
+        papers = creator.crawl(seeds, queue_size=1)
+        paper = await papers.__anext__()
+        await papers.aclose()
+        return paper
+
+    paper = asyncio.run(read_first_paper())
+
+    unread_dois = {"10/s0", "10/s1", "10/s2"} - {paper["doi"]}
+    assert creator.released_dois == {paper["doi"]}
+    assert set(creator.dataset) == unread_dois
+    assert creator.pending_dois == set()
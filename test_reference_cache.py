@@ -0,0 +1,19 @@
+from reference_cache import ReferenceCache
+
+
+def test_match_is_decided_by_the_requested_threshold(tmp_path):
+    cache_path = str(tmp_path / "reference_cache.json")
+    cache = ReferenceCache(cache_path, normalize=str.lower)
+
+    cache.set("Adam: a method for stochastic optimization", "10/adam", 0.78)
+    cache.save()
+
+    cache = ReferenceCache(cache_path, normalize=str.lower)
+    assert cache.get("ADAM: a method for  stochastic optimization", 0.75) == \
+        {"doi": "10/adam", "score": 0.78}
+    # seuil plus strict : pas de correspondance, sans nouvelle recherche
+    assert cache.get("adam: a method for stochastic optimization", 0.8) == \
+        {"doi": None, "score": 0.78}
+
+    assert cache.get("batch normalization", 0.8) is None
+    assert (cache.num_hits, cache.num_misses) == (2, 1)
@@ -0,0 +1,93 @@
+import json
+import types
+import asyncio
+
+import main
+import tracing
+
+
+def read_trace(path):
+    # format JSON Array : le crochet fermant est optionnel
+    with open(path) as f:
+        return json.loads(f.read() + "]")
+
+
+def test_events_are_appended_and_not_kept_in_memory(tmp_path):
+    trace_path = str(tmp_path / "trace.json")
+    tracer = tracing.Tracer(trace_path, flush_size=3)
+
+    for i in range(5):
+        with tracer.span("span", doi=f"10/{i}"):
+            pass
+    assert len(tracer.events) < 3
+
+    tracer.save()
+    assert tracer.events == []
+    with tracer.span("checkpoint"):
+        pass
+    tracer.save()
+
+    events = read_trace(trace_path)
+    assert [e["args"]["doi"] for e in events if e["name"] == "span"] == [
+        f"10/{i}" for i in range(5)
+    ]
+    assert events[-1]["name"] == "checkpoint"
+
+
+def test_loop_monitor_restores_debug_mode(tmp_path):
+    async def run(tracer):
+        loop = asyncio.get_running_loop()
+        loop.set_debug(True)
+        loop.slow_callback_duration = 1.0
+
+        monitor = tracer.start_loop_monitor()
+        await asyncio.sleep(0)
+        await tracer.stop_loop_monitor(monitor)
+        return loop.get_debug(), loop.slow_callback_duration
+
+    assert tracing.Tracer(str(tmp_path / "trace.json")).slow_callbacks is False
+    tracer = tracing.Tracer(str(tmp_path / "trace.json"), slow_callbacks=True)
+    assert asyncio.run(run(tracer)) == (True, 1.0)
+
+
+def test_spans_carry_the_doi_of_their_paper(tmp_path):
+    trace_path = str(tmp_path / "trace.json")
+    responses = {
+        "crossref/works?query.bibliographic=s0": {
+            "DOI": "10/s0", "title": ["s0"], "reference": [{"DOI": "10/r1"}]
+        },
+        "crossref/works/10/r1": {"DOI": "10/r1", "title": ["r1"]},
+        "crossref/works?query.bibliographic=r1": {"DOI": "10/r1", "title": ["r1"]},
+    }
+    creator = main.PaperGraphCreator(
+        "arxiv", "crossref", "mail", [], scrapp=False, trace_path=trace_path)
+
+    # requête simulée, tracée comme PaperGraphCreator.async_get_request
+    @tracing.traced("async_get_request")
+    async def fake_get_request(self, query, aiohttp_session, is_json=True):
+        self.tracer.tag(url=query)
+        if not is_json:
+            return None
+        return responses.get(query.split("&")[0])
+
+    creator.async_get_request = types.MethodType(fake_get_request, creator)
+    seed = types.SimpleNamespace(title="s0", arxiv_id=None, published=None, conference=None)
+    asyncio.run(creator._start_acquisition([seed]))
+    creator.tracer.save()
+
+    spans = [e for e in read_trace(trace_path) if e["ph"] == "X"]
+
+    def span_dois(name):
+        return {e["args"]["doi"] for e in spans if e["name"] == name}
+
+    assert span_dois("collect_paper") == {"10/s0"}
+    assert span_dois("_parse_references_list") == {"10/s0"}
+    assert span_dois("collect_paper_from_doi") == {"10/r1"}
+    assert span_dois("parse_paper_dict") == {"10/r1"}
+    # la recherche du papier de départ précède la découverte de son DOI
+    assert span_dois("async_get_request") == {None, "10/r1"}
+    for e in spans:
+        if e["name"] == "async_get_request" and e["args"]["doi"] is None:
+            assert e["args"]["url"].startswith("crossref/works?query.bibliographic=s0")
+    # spans imbriqués : le DOI est hérité du span englobant
+    assert span_dois("arxiv") == {"10/r1"}
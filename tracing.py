@@ -0,0 +1,290 @@
+import json
+import time
+import asyncio
+import logging
+import weakref
+import functools
+import threading
+import contextlib
+import contextvars
+
+"""
+
+    Traces d'exécution de la collecte, au format Chrome trace (JSON), à ouvrir
+    dans https://ui.perfetto.dev ou chrome://tracing.
+
+    Chaque span (collect_paper, requête GET, recherche arxiv, scrapping, checkpoint...)
+    est enregistré sur la piste de la tâche asyncio qui l'exécute, avec le DOI du
+    papier concerné. Les spans d'une même tâche s'imbriquent, ce qui permet de suivre
+    le chemin critique de chaque papier.
+
+    Un moniteur mesure en parallèle le retard de la boucle d'évènements (event loop
+    lag) : une coroutine dort à intervalle régulier, et tout réveil en retard signale
+    un appel synchrone bloquant (requests.get, SequenceMatcher, json.dumps...).
+    Optionnellement (slow_callbacks), le mode debug d'asyncio signale en plus chaque
+    callback plus lent que le seuil, au prix d'un ralentissement de la boucle.
+
+    La trace est écrite au fur et à mesure (format "JSON Array", dont le crochet
+    fermant est optionnel) : les évènements en mémoire sont ajoutés au fichier à
+    chaque sauvegarde, ou dès que leur nombre atteint flush_size, puis oubliés.
+
+"""
+
+PID = 1
+# piste dédiée aux mesures de la boucle d'évènements
+LOOP_TRACK_ID = 0
+
+_current_doi = contextvars.ContextVar("trace_doi", default=None)
+_current_span_args = contextvars.ContextVar("trace_span_args", default=None)
+
+
+def traced(name):
+    """Décorateur enregistrant un span autour d'une méthode (coroutine ou non)
+        d'un objet possédant un attribut tracer
+
+    Args:
+        name (str): nom du span
+    """
+    def decorator(function):
+        if asyncio.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def wrapper(self, *args, **kwargs):
+                with self.tracer.span(name):
+                    return await function(self, *args, **kwargs)
+        else:
+            @functools.wraps(function)
+            def wrapper(self, *args, **kwargs):
+                with self.tracer.span(name):
+                    return function(self, *args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+class NullTracer():
+    """Tracer par défaut, quand le traçage n'est pas activé : n'enregistre rien"""
+
+    def span(self, name, doi=None, **args):
+        return contextlib.nullcontext({})
+
+    def set_doi(self, doi):
+        pass
+
+    def tag(self, **args):
+        pass
+
+    def start_loop_monitor(self):
+        return None
+
+    async def stop_loop_monitor(self, monitor):
+        pass
+
+    def save(self):
+        pass
+
+
+class _SlowCallbackHandler(logging.Handler):
+    """Récupère les avertissements "Executing <Handle> took X seconds" du mode debug d'asyncio"""
+
+    def __init__(self, tracer):
+        super().__init__(logging.WARNING)
+        self.tracer = tracer
+
+    def emit(self, record):
+        if not record.msg.startswith("Executing") or len(record.args) != 2:
+            return
+
+        callback, duration = record.args
+        duration_us = duration * 1e6
+        self.tracer.add_event({
+            "name": "slow callback", "ph": "X", "cat": "event_loop",
+            "ts": self.tracer.now() - duration_us, "dur": duration_us,
+            "pid": PID, "tid": LOOP_TRACK_ID,
+            "args": {"callback": str(callback)}
+        })
+
+
+class Tracer():
+    def __init__(self, path, lag_interval=0.05, lag_threshold=0.1, slow_callbacks=False,
+                 flush_size=10000):
+        """
+        Args:
+            path (str): fichier JSON de la trace
+            lag_interval (float, optional): intervalle de mesure du retard de la boucle
+                d'évènements, en secondes. Defaults to 0.05.
+            lag_threshold (float, optional): retard (et durée de callback) à partir duquel
+                la boucle est considérée bloquée, en secondes. Defaults to 0.1.
+            slow_callbacks (bool, optional): active le mode debug d'asyncio pour signaler
+                les callbacks lents. Précis, mais ralentit fortement la boucle et fausse
+                la mesure du retard. Defaults to False.
+            flush_size (int, optional): nombre d'évènements en mémoire à partir duquel ils
+                sont écrits dans le fichier. Defaults to 10000.
+        """
+        self.path = path
+        self.lag_interval = lag_interval
+        self.lag_threshold = lag_threshold
+        self.slow_callbacks = slow_callbacks
+        self.flush_size = flush_size
+
+        self.start_time = time.perf_counter()
+        self.events = []
+        self.num_written_events = 0
+        with open(self.path, "w") as f:
+            f.write("[\n")
+        self.add_event(self._track_name_event(LOOP_TRACK_ID, "event loop"))
+
+        self._task_tracks = weakref.WeakKeyDictionary()
+        self._thread_tracks = {}
+        self._next_track_id = LOOP_TRACK_ID + 1
+
+    def add_event(self, event):
+        self.events.append(event)
+        if len(self.events) >= self.flush_size:
+            self.save()
+
+    def now(self):
+        """
+        Returns:
+            float: temps écoulé depuis la création du tracer, en microsecondes
+        """
+        return (time.perf_counter() - self.start_time) * 1e6
+
+    def _track_name_event(self, track_id, track_name):
+        return {
+            "name": "thread_name", "ph": "M", "pid": PID, "tid": track_id,
+            "args": {"name": track_name}
+        }
+
+    def _new_track(self, track_name):
+        track_id = self._next_track_id
+        self._next_track_id += 1
+        self.add_event(self._track_name_event(track_id, track_name))
+        return track_id
+
+    def _track_id(self):
+        """
+        Returns:
+            int: piste de la tâche asyncio courante, ou du thread courant hors tâche
+        """
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+
+        if task is not None:
+            if task not in self._task_tracks:
+                self._task_tracks[task] = self._new_track(task.get_name())
+            return self._task_tracks[task]
+
+        thread = threading.current_thread()
+        if thread.ident not in self._thread_tracks:
+            self._thread_tracks[thread.ident] = self._new_track(thread.name)
+        return self._thread_tracks[thread.ident]
+
+    @contextlib.contextmanager
+    def span(self, name, doi=None, **args):
+        """Enregistre un span. Sans DOI explicite, le span hérite du DOI du span englobant
+
+        Args:
+            name (str): nom du span
+            doi (str, optional): DOI du papier concerné. Defaults to None.
+
+        Yields:
+            dict: arguments du span, modifiables jusqu'à sa fin
+        """
+        if doi is None:
+            doi = _current_doi.get()
+        args = {"doi": doi, **args}
+
+        doi_token = _current_doi.set(doi)
+        args_token = _current_span_args.set(args)
+        track_id = self._track_id()
+        start = self.now()
+        try:
+            yield args
+        finally:
+            _current_span_args.reset(args_token)
+            _current_doi.reset(doi_token)
+            self.add_event({
+                "name": name, "ph": "X", "ts": start, "dur": self.now() - start,
+                "pid": PID, "tid": track_id, "args": args
+            })
+
+    def set_doi(self, doi):
+        """Associe un DOI au span courant et aux spans qu'il contient (quand le DOI
+            n'est connu qu'en cours de span)
+        """
+        _current_doi.set(doi)
+        self.tag(doi=doi)
+
+    def tag(self, **args):
+        """Ajoute des arguments au span courant"""
+        span_args = _current_span_args.get()
+        if span_args is not None:
+            span_args.update(args)
+
+    async def _monitor_event_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected_wakeup = loop.time() + self.lag_interval
+            expected_wakeup_us = self.now() + self.lag_interval * 1e6
+            await asyncio.sleep(self.lag_interval)
+
+            lag = max(loop.time() - expected_wakeup, 0)
+            self.add_event({
+                "name": "event loop lag", "ph": "C", "ts": self.now(),
+                "pid": PID, "args": {"lag_ms": lag * 1e3}
+            })
+            if lag >= self.lag_threshold:
+                self.add_event({
+                    "name": "event loop blocked", "ph": "X", "cat": "event_loop",
+                    "ts": expected_wakeup_us, "dur": lag * 1e6,
+                    "pid": PID, "tid": LOOP_TRACK_ID, "args": {"lag_ms": lag * 1e3}
+                })
+
+    def start_loop_monitor(self):
+        """Lance la mesure du retard de la boucle d'évènements courante
+
+        Returns:
+            tuple: moniteur à passer à stop_loop_monitor
+        """
+        loop = asyncio.get_running_loop()
+
+        handler = None
+        # état du mode debug avant le traçage, restauré à l'arrêt du moniteur
+        previous_debug = (loop.get_debug(), loop.slow_callback_duration)
+        if self.slow_callbacks:
+            loop.set_debug(True)
+            loop.slow_callback_duration = self.lag_threshold
+            handler = _SlowCallbackHandler(self)
+            logging.getLogger("asyncio").addHandler(handler)
+
+        task = loop.create_task(self._monitor_event_loop(), name="event loop monitor")
+        return task, handler, previous_debug
+
+    async def stop_loop_monitor(self, monitor):
+        task, handler, previous_debug = monitor
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+        if handler is not None:
+            logging.getLogger("asyncio").removeHandler(handler)
+            loop = asyncio.get_running_loop()
+            loop.set_debug(previous_debug[0])
+            loop.slow_callback_duration = previous_debug[1]
+
+    def save(self):
+        """Ajoute au fichier de trace les évènements en mémoire, puis les oublie"""
+        if len(self.events) == 0:
+            return
+
+        with open(self.path, "a") as f:
+            for event in self.events:
+                if self.num_written_events > 0:
+                    f.write(",\n")
+                f.write(json.dumps(event))
+                self.num_written_events += 1
+        self.events.clear()